@@ -5,39 +5,147 @@ Generates MIL-SPEC compliance reports for build-in-public transparency
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import string
 import datetime
 import hashlib
+import functools
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Secret scan configuration: lines matching SECRET_PATTERN in files with these
+# suffixes count as hits, unless the path or line contains an allow marker
+SECRET_PATTERN = re.compile(rb"(password|secret|key|token)")
+SECRET_SCAN_SUFFIXES = (".py", ".js", ".rs")
+SECRET_ALLOW_MARKERS = (b"example", b"test")
+SECRET_SCAN_SKIP_DIRS = frozenset({".git", "target", "node_modules"})
+SECURITY_CACHE_FILE = Path("audits", ".cache", "security.json")
+
+def _sha256_file(path):
+    """Stream a file through SHA-256 without loading it into memory"""
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def _hash_one(path):
+    """Hash a single artifact; runs in a worker thread"""
+    name = os.path.basename(path)
+    try:
+        return name, _sha256_file(path)[:16]
+    except OSError:
+        return name, "<error>"
+
+def _iter_target(root="target", limit=10):
+    """Yield up to `limit` Rust artifact paths under `root` in a single pass"""
+    found = 0
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and (entry.name.endswith(".rlib") or
+                                              entry.name.startswith("crucible")):
+                        yield entry.path
+                        found += 1
+                        if found >= limit:
+                            return
+        except OSError:
+            continue
+
+@functools.lru_cache(maxsize=None)
+def _load_template(path):
+    """Read a report template and split it into (literal, field, spec) parts once"""
+    with open(path, "r") as f:
+        return tuple((literal, field, spec)
+                     for literal, field, spec, _conversion in string.Formatter().parse(f.read()))
+
+def _render_template(parts, fields):
+    """Fill a pre-parsed template; same result as str.format for plain {name} fields"""
+    out = []
+    for literal, field, spec in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(format(fields[field], spec))
+    return "".join(out)
+
 class AuditReportGenerator:
     def __init__(self):
         self.timestamp = datetime.datetime.now(datetime.timezone.utc)
         self.audit_id = self.timestamp.strftime("%Y%m%d_%H%M%S")
         self.version = self._get_version()
+        self.head_commit = self._get_head_commit()
         self.build_hash = self._get_build_hash()
         
     def _get_version(self):
         """Extract version from BUILD_CHECKLIST.md"""
         try:
-            with open("BUILD_CHECKLIST.md", "r") as f:
-                for line in f:
-                    if "Current Status" in line and "v0." in line:
-                        return line.split("v")[1].split("-")[0] + "-alpha"
+            with open("BUILD_CHECKLIST.md", "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return "0.1.3-alpha"
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    pos = data.find(b"Current Status")
+                    while pos >= 0:
+                        line_end = data.find(b"\n", pos)
+                        if line_end < 0:
+                            line_end = len(data)
+                        start = data.find(b"v0.", pos, line_end)
+                        if start >= 0:
+                            end = data.find(b"-", start, line_end)
+                            if end < 0:
+                                end = line_end
+                            return data[start + 1:end].decode().strip() + "-alpha"
+                        pos = data.find(b"Current Status", line_end)
             return "0.1.3-alpha"
-        except:
+        except (OSError, ValueError):
             return "unknown"
     
+    def _get_head_commit(self):
+        """Read the full commit id of HEAD, or None outside a git checkout"""
+        try:
+            git_dir = Path(".git")
+            if git_dir.is_file():
+                # Worktrees and submodules: .git is a "gitdir: <path>" pointer
+                git_dir = Path(git_dir.read_text().split("gitdir:", 1)[1].strip())
+            head = (git_dir / "HEAD").read_text().strip()
+            if head.startswith("ref: "):
+                head = self._resolve_git_ref(git_dir, head[5:])
+            return head
+        except (OSError, IndexError):
+            return None
+    
     def _get_build_hash(self):
         """Generate hash of current build state"""
-        try:
-            result = subprocess.run(["git", "rev-parse", "HEAD"], 
-                                  capture_output=True, text=True)
-            return result.stdout.strip()[:8]
-        except:
-            return "local"
+        return self.head_commit[:8] if self.head_commit else "local"
+    
+    def _resolve_git_ref(self, git_dir, ref):
+        """Resolve a ref name to a commit id without running git"""
+        # Branch refs of a linked worktree live in the shared git dir
+        common_file = git_dir / "commondir"
+        if common_file.is_file():
+            git_dir = git_dir / common_file.read_text().strip()
+        
+        ref_file = git_dir / ref
+        if ref_file.is_file():
+            return ref_file.read_text().strip()
+        
+        # Refs are moved into packed-refs by `git gc` / `git pack-refs`
+        with open(git_dir / "packed-refs", "r") as f:
+            for line in f:
+                if line.rstrip("\n").endswith(" " + ref) and not line.startswith(("#", "^")):
+                    return line.split(" ", 1)[0]
+        raise FileNotFoundError(ref)
     
     def _run_security_scan(self):
         """Run security scans and return results"""
@@ -52,23 +160,98 @@ class AuditReportGenerator:
         
         # Check for secrets
         try:
-            result = subprocess.run([
-                "grep", "-r", "-E", "(password|secret|key|token)",
-                "--include=*.py", "--include=*.js", "--include=*.rs", "."
-            ], capture_output=True, text=True)
+            scan_files = []
+            for root, dirs, files in os.walk("."):
+                # Build artifacts and VCS internals are never scanned
+                dirs[:] = [d for d in dirs if d not in SECRET_SCAN_SKIP_DIRS]
+                for name in files:
+                    if name.endswith(SECRET_SCAN_SUFFIXES):
+                        scan_files.append(os.path.join(root, name))
             
-            if result.returncode == 0:
-                lines = [l for l in result.stdout.split('\n') 
-                        if l and 'example' not in l and 'test' not in l]
-                if lines:
-                    results["secrets_status"] = "FOUND"
-                    results["secrets_count"] = len(lines)
-                    results["secrets_action"] = "Review and sanitize"
-        except:
+            # Reuse the previous result if HEAD and every scanned file are unchanged
+            cache_key = self._security_cache_key(scan_files)
+            cached = self._read_security_cache(cache_key)
+            if cached is not None:
+                results.update(cached)
+                return results
+            
+            count = sum(self._count_secret_lines(path) for path in scan_files)
+            if count:
+                results["secrets_status"] = "FOUND"
+                results["secrets_count"] = count
+                results["secrets_action"] = "Review and sanitize"
+            
+            self._write_security_cache(cache_key, {
+                key: results[key]
+                for key in ("secrets_status", "secrets_count", "secrets_action")
+            })
+        except OSError:
             pass
             
         return results
     
+    def _security_cache_key(self, scan_files):
+        """Digest of HEAD plus path/size/mtime of every file the scan reads"""
+        key = hashlib.blake2b(digest_size=16)
+        key.update((self.head_commit or "").encode())
+        for path in scan_files:
+            # Files that cannot be stat'ed (dangling symlinks, files removed
+            # mid-walk) still contribute a marker, never abort the scan
+            try:
+                st = os.stat(path)
+                key.update(f"\0{path}\0{st.st_size}\0{st.st_mtime_ns}".encode())
+            except OSError:
+                key.update(f"\0{path}\0<unreadable>".encode())
+        return key.hexdigest()
+    
+    def _read_security_cache(self, cache_key):
+        """Return cached secret scan results for this key, or None"""
+        try:
+            cached = json.loads(SECURITY_CACHE_FILE.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("key") != cache_key:
+            return None
+        return cached.get("results")
+    
+    def _write_security_cache(self, cache_key, secrets):
+        """Store the latest secret scan; only one cache entry is ever kept"""
+        try:
+            SECURITY_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            SECURITY_CACHE_FILE.write_text(json.dumps({"key": cache_key, "results": secrets}))
+        except OSError:
+            pass
+    
+    def _count_secret_lines(self, path):
+        """Count lines in a file that look like they contain a secret"""
+        # Hits in a file whose path contains an allow marker are ignored
+        if any(m in os.fsencode(path) for m in SECRET_ALLOW_MARKERS):
+            return 0
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return 0
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # Skip binary files (a NUL byte in the first 8 KiB)
+                    if data.find(b"\0", 0, 8192) >= 0:
+                        return 0
+                    count = 0
+                    pos = 0
+                    while True:
+                        match = SECRET_PATTERN.search(data, pos)
+                        if match is None:
+                            return count
+                        start = data.rfind(b"\n", 0, match.start()) + 1
+                        end = data.find(b"\n", match.end())
+                        if end < 0:
+                            end = len(data)
+                        line = data[start:end]
+                        if not any(m in line for m in SECRET_ALLOW_MARKERS):
+                            count += 1
+                        pos = end + 1
+        except OSError:
+            return 0
+    
     def _run_code_quality_checks(self):
         """Run code quality checks"""
         results = {
@@ -82,46 +265,90 @@ class AuditReportGenerator:
             "python_types_status": "UNKNOWN"
         }
         
-        # Rust checks
+        # Rust checks: start every cargo process up front so they overlap,
+        # then collect their results once the Python checks are done.
+        # `cargo test` covers the build as well, and clippy reuses the same
+        # target dir. Output that is never inspected goes to /dev/null.
+        rust_procs = {}
         try:
-            # Format check
-            result = subprocess.run(["cargo", "fmt", "--check"], 
-                                  capture_output=True)
-            results["rust_fmt_status"] = "PASS" if result.returncode == 0 else "FAIL"
-            
-            # Clippy check
-            result = subprocess.run(["cargo", "clippy", "--", "-D", "warnings"], 
-                                  capture_output=True)
-            results["rust_clippy_status"] = "PASS" if result.returncode == 0 else "FAIL"
-            
-            # Build check
-            result = subprocess.run(["cargo", "build"], capture_output=True)
-            results["rust_build_status"] = "PASS" if result.returncode == 0 else "FAIL"
-            
-            # Test check
-            result = subprocess.run(["cargo", "test"], capture_output=True)
-            results["rust_test_status"] = "PASS" if result.returncode == 0 else "FAIL"
-        except:
+            rust_procs["fmt"] = subprocess.Popen(
+                ["cargo", "fmt", "--check"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            rust_procs["clippy"] = subprocess.Popen(
+                ["cargo", "clippy", "--message-format=json"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            rust_procs["test"] = subprocess.Popen(
+                ["cargo", "test", "--no-fail-fast", "--message-format=json"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except (OSError, subprocess.SubprocessError):
             pass
         
         # Python checks
         try:
             py_files = list(Path(".").glob("*.py"))
             if py_files:
-                # Syntax check
+                # Syntax check (compiled in-process, nothing is written to disk)
                 all_valid = True
                 for py_file in py_files:
-                    result = subprocess.run(["python3", "-m", "py_compile", str(py_file)], 
-                                          capture_output=True)
-                    if result.returncode != 0:
+                    try:
+                        compile(py_file.read_bytes(), str(py_file), "exec")
+                    except (SyntaxError, ValueError):
                         all_valid = False
                         break
                 results["python_syntax_status"] = "PASS" if all_valid else "FAIL"
-        except:
+        except OSError:
+            pass
+        
+        # Collect Rust results. Both JSON streams are drained concurrently:
+        # a child blocked on a full pipe while holding the cargo build lock
+        # would otherwise stall the other one forever.
+        try:
+            with ThreadPoolExecutor(max_workers=len(rust_procs) or 1) as executor:
+                outputs = dict(zip(rust_procs, executor.map(
+                    lambda proc: proc.communicate()[0], rust_procs.values())))
+            
+            if "fmt" in rust_procs:
+                results["rust_fmt_status"] = "PASS" if rust_procs["fmt"].returncode == 0 else "FAIL"
+            
+            if "clippy" in rust_procs:
+                clippy_ok, has_warnings = self._parse_cargo_messages(outputs["clippy"])
+                results["rust_clippy_status"] = "PASS" if clippy_ok and not has_warnings else "FAIL"
+            
+            if "test" in rust_procs:
+                # Build status comes from the test run's build-finished message
+                build_ok, _ = self._parse_cargo_messages(outputs["test"])
+                results["rust_build_status"] = "PASS" if build_ok else "FAIL"
+                results["rust_test_status"] = "PASS" if rust_procs["test"].returncode == 0 else "FAIL"
+        except (OSError, subprocess.SubprocessError):
             pass
             
         return results
     
+    def _parse_cargo_messages(self, stream):
+        """Parse a cargo --message-format=json stream.
+        
+        Returns (build_ok, has_warnings). build_ok comes from the final
+        build-finished message; any compiler warning or error counts as a
+        clippy finding, which matches the old `-D warnings` semantics.
+        """
+        build_ok = False
+        has_warnings = False
+        for line in stream.splitlines():
+            if not line.startswith("{"):
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            reason = message.get("reason")
+            if reason == "compiler-message":
+                level = message.get("message", {}).get("level")
+                if level in ("warning", "error"):
+                    has_warnings = True
+            elif reason == "build-finished":
+                build_ok = bool(message.get("success"))
+        return build_ok, has_warnings
+    
     def _check_verification_readiness(self):
         """Check formal verification tool availability"""
         results = {
@@ -136,18 +363,19 @@ class AuditReportGenerator:
         # Check Tree-Sitter
         try:
             result = subprocess.run(["tree-sitter", "--version"], 
-                                  capture_output=True)
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             if result.returncode == 0:
                 results["treesitter_status"] = "AVAILABLE"
-        except:
+        except (OSError, subprocess.SubprocessError):
             pass
         
         # Check Z3
         try:
-            result = subprocess.run(["z3", "--version"], capture_output=True)
+            result = subprocess.run(["z3", "--version"], 
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             if result.returncode == 0:
                 results["z3_status"] = "AVAILABLE"
-        except:
+        except (OSError, subprocess.SubprocessError):
             pass
             
         return results
@@ -163,8 +391,9 @@ class AuditReportGenerator:
         
         results = {}
         for doc_key, pattern in required_docs.items():
-            files = list(Path(".").glob(pattern))
-            results[doc_key] = "PRESENT" if files else "MISSING"
+            # Presence only: stop at the first match
+            first = next(Path(".").glob(pattern), None)
+            results[doc_key] = "PRESENT" if first is not None else "MISSING"
         
         # Compliance standards
         results.update({
@@ -181,19 +410,17 @@ class AuditReportGenerator:
         hashes = []
         
         try:
-            # Find Rust artifacts
-            target_files = list(Path("target").rglob("*.rlib"))
-            target_files.extend(list(Path("target").rglob("crucible*")))
+            # Find Rust artifacts (limited to the first 10)
+            target_files = list(_iter_target())
+            artifacts = target_files
             
-            for artifact in target_files[:10]:  # Limit to first 10
-                artifacts.append(str(artifact))
-                try:
-                    with open(artifact, "rb") as f:
-                        file_hash = hashlib.sha256(f.read()).hexdigest()[:16]
-                        hashes.append(f"{artifact.name}: {file_hash}")
-                except:
-                    hashes.append(f"{artifact.name}: <error>")
-        except:
+            # Hash artifacts concurrently; file_digest releases the GIL, so
+            # threads give real parallelism without forking worker processes
+            if target_files:
+                with ThreadPoolExecutor(max_workers=len(target_files)) as executor:
+                    for name, file_hash in executor.map(_hash_one, target_files):
+                        hashes.append(f"{name}: {file_hash}")
+        except OSError:
             artifacts = ["No artifacts found"]
             hashes = ["No hashes available"]
             
@@ -204,11 +431,20 @@ class AuditReportGenerator:
         # Ensure audits directory exists
         os.makedirs("audits", exist_ok=True)
         
-        # Collect all data
-        security_data = self._run_security_scan()
-        quality_data = self._run_code_quality_checks()
-        verification_data = self._check_verification_readiness()
-        compliance_data = self._check_milspec_compliance()
+        # Collect all data (the collectors are independent, so run them concurrently)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            security_future = executor.submit(self._run_security_scan)
+            quality_future = executor.submit(self._run_code_quality_checks)
+            verification_future = executor.submit(self._check_verification_readiness)
+            compliance_future = executor.submit(self._check_milspec_compliance)
+        
+        security_data = security_future.result()
+        quality_data = quality_future.result()
+        verification_data = verification_future.result()
+        compliance_data = compliance_future.result()
+        
+        # Artifacts are collected only once the cargo build above has
+        # finished, so target/ is never walked or hashed mid-build
         artifacts, artifact_hashes = self._get_build_artifacts()
         
         # Determine overall status
@@ -217,12 +453,11 @@ class AuditReportGenerator:
             quality_data["rust_build_status"] == "FAIL"):
             status = "FAIL"
         
-        # Load template
-        with open("templates/audit_report_template.md", "r") as f:
-            template = f.read()
+        # Load pre-parsed template
+        template = _load_template("templates/audit_report_template.md")
         
         # Fill template
-        report = template.format(
+        report = _render_template(template, dict(
             audit_id=self.audit_id,
             timestamp=self.timestamp.isoformat(),
             version=self.version,
@@ -259,7 +494,7 @@ class AuditReportGenerator:
             # Certification
             digital_signature=f"LOCAL-CI-{self.build_hash}",
             next_audit_date=(self.timestamp + datetime.timedelta(days=7)).strftime("%Y-%m-%d")
-        )
+        ))
         
         # Write report
         report_file = f"audits/audit-{self.version}-{self.audit_id}.md"
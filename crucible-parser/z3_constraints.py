@@ -6,8 +6,35 @@ Phase 2: Parser & Basic Verification - v0.2.0-alpha
 This module generates Z3 SMT constraints from parsed requirements.
 """
 
+import hashlib
+import operator
+import re
+
 from z3 import *
 
+# Matches "(assert <expr>)" lines and simple "(left op right)" expressions
+_ASSERT_RE = re.compile(r'\(assert\s+(.+)\)\s*$')
+_CONSTRAINT_RE = re.compile(r'\((\w+)\s*(>=|<=|==|>|<)\s*(\w+)\)')
+
+# Comparison operators supported in constraint expressions
+_OPS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    '==': operator.eq,
+}
+
+# Previous verify_constraints results keyed by a digest of the constraint
+# text; the oldest entry is evicted once the cache is full
+_VERIFY_CACHE = {}
+_VERIFY_CACHE_SIZE = 512
+
+def _is_int(s):
+    """Return True if s is a (possibly signed) integer literal that int() accepts"""
+    return s[1:].isdecimal() if s[:1] in ('-', '+') else s.isdecimal()
+
+
 def generate_constraints(requirements):
     """
     Generate Z3 constraints from a list of parsed requirements.
@@ -16,87 +43,91 @@ def generate_constraints(requirements):
         requirements: List of requirement dictionaries
         
     Returns:
-        Tuple of (Solver, Dict of variables, constraints string)
+        Tuple of (Solver, Dict of variables, SMT-LIB 2 constraints string)
     """
     solver = Solver()
     variables = {}
-    constraints_log = []
+    clauses = []
     
-    for req in requirements:
-        # Extract constraint information
-        subject = req.get('subject', 'x')
-        action = req.get('action', {})
-        condition = req.get('condition')
-        constraint = req.get('constraint')
+    def add_clause(spec, default_var):
+        left_var = spec.get('left_variable', default_var)
+        right_val = spec.get('right_value', '0')
+        op_symbol = spec.get('operator', '>=')
         
-        # Create variables based on constraint expressions
-        if condition:
-            left_var = condition.get('left_variable', 'x')
-            right_val = condition.get('right_value', '0')
-            operator = condition.get('operator', '>=')
-            
-            # Ensure variable exists
-            if left_var not in variables:
-                variables[left_var] = Int(left_var)
-            
-            # Parse right value as integer
-            try:
-                right_int = int(right_val)
-                right_expr = right_int
-            except ValueError:
-                if right_val not in variables:
-                    variables[right_val] = Int(right_val)
-                right_expr = variables[right_val]
-            
-            # Add constraint based on operator
-            if operator == '>=':
-                solver.add(variables[left_var] >= right_expr)
-                constraints_log.append(f"({left_var} >= {right_val})")
-            elif operator == '<=':
-                solver.add(variables[left_var] <= right_expr)
-                constraints_log.append(f"({left_var} <= {right_val})")
-            elif operator == '>':
-                solver.add(variables[left_var] > right_expr)
-                constraints_log.append(f"({left_var} > {right_val})")
-            elif operator == '<':
-                solver.add(variables[left_var] < right_expr)
-                constraints_log.append(f"({left_var} < {right_val})")
-            elif operator == '==':
-                solver.add(variables[left_var] == right_expr)
-                constraints_log.append(f"({left_var} == {right_val})")
+        # Ensure variable exists
+        if left_var not in variables:
+            variables[left_var] = Int(left_var)
         
-        if constraint:
-            left_var = constraint.get('left_variable', 'y')
-            right_val = constraint.get('right_value', '0')
-            operator = constraint.get('operator', '>=')
-            
-            # Ensure variable exists
-            if left_var not in variables:
-                variables[left_var] = Int(left_var)
-            
-            # Parse right value
-            try:
-                right_int = int(right_val)
-                right_expr = right_int
-            except ValueError:
-                if right_val not in variables:
-                    variables[right_val] = Int(right_val)
-                right_expr = variables[right_val]
-            
-            # Add constraint
-            if operator == '>=':
-                solver.add(variables[left_var] >= right_expr)
-                constraints_log.append(f"({left_var} >= {right_val})")
-            elif operator == '<=':
-                solver.add(variables[left_var] <= right_expr)
-                constraints_log.append(f"({left_var} <= {right_val})")
+        # Parse right value as integer literal or variable
+        if _is_int(right_val):
+            right_expr = int(right_val)
+        else:
+            if right_val not in variables:
+                variables[right_val] = Int(right_val)
+            right_expr = variables[right_val]
+        
+        # Collect constraint based on operator (unknown operators add none,
+        # but their variables are still reported)
+        op = _OPS.get(op_symbol)
+        if op is not None:
+            clauses.append(op(variables[left_var], right_expr))
+    
+    for req in requirements:
+        # Create variables based on condition/constraint expressions
+        for key, default_var in (('condition', 'x'), ('constraint', 'y')):
+            spec = req.get(key)
+            if spec:
+                add_clause(spec, default_var)
     
-    # Format constraints for display
-    constraints_str = '\n'.join([f"(assert {c})" for c in constraints_log])
+    # Assert everything in one call
+    solver.add(*clauses)
+    
+    # Format constraints as SMT-LIB (declarations + asserts) so that
+    # verify_constraints can hand them to Z3's native parser
+    constraints_str = solver.sexpr().strip()
     
     return solver, variables, constraints_str
 
 
+def _parse_legacy_constraints(constraints_str):
+    """
+    Parse infix "(assert (left op right))" lines into Z3 clauses.
+    
+    Args:
+        constraints_str: Constraint text, one assert per line
+        
+    Returns:
+        List of Z3 boolean expressions
+        
+    Raises:
+        ValueError: If an assert line is not a supported "(left op right)" expression
+    """
+    # Reuse one Z3 constant per variable name
+    variables = {}
+    clauses = []
+    
+    def var(name):
+        v = variables.get(name)
+        if v is None:
+            v = variables[name] = Int(name)
+        return v
+    
+    for line in constraints_str.strip().split('\n'):
+        assert_match = _ASSERT_RE.match(line.strip())
+        if assert_match:
+            # Parse simple constraints like "(x >= 0)"
+            match = _CONSTRAINT_RE.match(assert_match.group(1))
+            if not match:
+                # Never drop an assertion: a skipped line could turn UNSAT into SAT
+                raise ValueError(f"Unsupported constraint: {line.strip()}")
+            left, op, right = match.groups()
+            right_expr = int(right) if _is_int(right) else var(right)
+            
+            clauses.append(_OPS[op](var(left), right_expr))
+    
+    return clauses
+
+
 def verify_constraints(constraints_output):
     """
     Verify constraints using Z3 solver.
@@ -114,52 +145,66 @@ def verify_constraints(constraints_output):
         with open(constraints_output, 'r') as f:
             constraints_str = f.read()
     
-    # Create a new solver
-    solver = Solver()
+    # Repeat audits usually verify the same constraint set again
+    cache_key = hashlib.blake2b(constraints_str.encode(), digest_size=16).digest()
+    cached = _VERIFY_CACHE.get(cache_key)
+    if cached is not None:
+        return _copy_result(cached)
     
-    # Parse and add constraints
-    for line in constraints_str.strip().split('\n'):
-        line = line.strip()
-        if line.startswith('(assert') and line.endswith(')'):
-            constraint = line[7:-1]  # Remove "(assert " and ")"
-            # Parse simple constraints like "(x >= 0)"
-            import re
-            match = re.match(r'\((\w+)\s*(>=|<=|==|>|<)\s*(\w+)\)', constraint)
-            if match:
-                left, op, right = match.groups()
-                try:
-                    right_val = int(right)
-                    right_expr = right_val
-                except ValueError:
-                    right_expr = Int(right)
-                
-                if op == '>=':
-                    solver.add(Int(left) >= right_expr)
-                elif op == '<=':
-                    solver.add(Int(left) <= right_expr)
-                elif op == '>':
-                    solver.add(Int(left) > right_expr)
-                elif op == '<':
-                    solver.add(Int(left) < right_expr)
-                elif op == '==':
-                    solver.add(Int(left) == right_expr)
+    # SMT-LIB input (as emitted by generate_constraints) goes straight to
+    # Z3's native parser; legacy "(assert (x >= 0))" lines are parsed here
+    solver = None
+    if constraints_str.lstrip().startswith(('(declare-', '(assert')):
+        solver = Solver()
+        try:
+            solver.from_string(constraints_str)
+        except Z3Exception:
+            solver = None
+    if solver is None:
+        solver = Solver()
+        solver.add(*_parse_legacy_constraints(constraints_str))
     
     # Check satisfiability
     result = solver.check()
     
     if result == sat:
         model = solver.model()
-        return {
+        verification = {
             'status': 'SAT',
             'satisfiable': True,
-            'model': {str(d): model[d] for d in model.decls() if d.name() != 'true' and d.name() != 'false'}
+            'model': {str(d): _model_value(model[d]) for d in model.decls()}
         }
     else:
-        return {
+        verification = {
             'status': 'UNSAT',
             'satisfiable': False,
             'message': 'Constraints are unsatisfiable - requirements are contradictory'
         }
+    
+    # Only definitive answers are cached; "unknown" may resolve on retry
+    if result != unknown:
+        if len(_VERIFY_CACHE) >= _VERIFY_CACHE_SIZE:
+            del _VERIFY_CACHE[next(iter(_VERIFY_CACHE))]
+        _VERIFY_CACHE[cache_key] = verification
+    
+    return _copy_result(verification)
+
+
+def _model_value(value):
+    """Convert a Z3 model value to a plain Python value"""
+    if is_int_value(value):
+        return value.as_long()
+    if is_true(value) or is_false(value):
+        return is_true(value)
+    return str(value)
+
+
+def _copy_result(verification):
+    """Copy a cached result so callers cannot mutate the cache"""
+    copy = dict(verification)
+    if 'model' in copy:
+        copy['model'] = dict(copy['model'])
+    return copy
 
 
 if __name__ == '__main__':
@@ -193,6 +238,7 @@ if __name__ == '__main__':
     print(f"\nGenerated variables: {list(variables.keys())}")
     print(f"\nConstraints:\n{constraints}")
     
-    print(f"\nZ3 Solver check: {solver.check()}")
-    if solver.check() == sat:
+    check_result = solver.check()
+    print(f"\nZ3 Solver check: {check_result}")
+    if check_result == sat:
         print(f"Model: {solver.model()}")
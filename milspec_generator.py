@@ -6,121 +6,33 @@ Generates and validates MIL-STD-498 compliant documentation
 
 import os
 import sys
-import json
 import datetime
-import html
+import functools
+import re
 from pathlib import Path
-from typing import Dict, List, Optional
-from werkzeug.utils import secure_filename
-
-class MilSpecDocGenerator:
-    def __init__(self, project_root: str):
-        # Validate and sanitize project root path
-        self.project_root = self._safe_path_join(Path.cwd(), project_root)
-        self.docs_dir = self._safe_path_join(self.project_root, "docs")
-        self.templates_dir = self._safe_path_join(self.docs_dir, "templates")
-        self.active_dir = self._safe_path_join(self.docs_dir, "active")
-        
-        # Ensure directories exist
-        try:
-            self.docs_dir.mkdir(exist_ok=True)
-            self.templates_dir.mkdir(exist_ok=True)
-            self.active_dir.mkdir(exist_ok=True)
-        except OSError as e:
-            raise ValueError(f"Failed to create directories: {e}")
-        
-        # Current date for document IDs (timezone-aware)
-        self.current_date = datetime.datetime.now(datetime.timezone.utc)
-        
-    def _safe_path_join(self, base_path: Path, *paths: str) -> Path:
-        """Safely join paths and prevent directory traversal"""
-        result = base_path
-        for path in paths:
-            # Sanitize each path component
-            clean_path = secure_filename(str(path))
-            if not clean_path or clean_path in ('.', '..'):
-                raise ValueError(f"Invalid path component: {path}")
-            result = result / clean_path
-        
-        # Ensure result is within base_path
-        try:
-            result.resolve().relative_to(base_path.resolve())
-        except ValueError:
-            raise ValueError(f"Path traversal attempt detected: {result}")
-        
-        return result
-    
-    def _sanitize_input(self, text: str) -> str:
-        """Sanitize user input to prevent XSS"""
-        if not isinstance(text, str):
-            raise ValueError("Input must be a string")
-        return html.escape(text.strip())
-        
-    def generate_document_id(self, doc_type: str, version: str = "1.0") -> str:
-        """Generate MIL-SPEC compliant document ID"""
-        # Sanitize inputs
-        clean_doc_type = self._sanitize_input(doc_type)
-        clean_version = self._sanitize_input(version)
-        date_str = self.current_date.strftime("%Y%m%d")
-        return f"CRU-{clean_doc_type}-{clean_version}-{date_str}"
-    
-    def create_document_header(self, title: str, doc_type: str, classification: str = "CONTROLLED") -> str:
-        """Create standard MIL-SPEC document header"""
-        doc_id = self.generate_document_id(doc_type)
-        return f"""# {title}
-**Document ID**: {doc_id}
-**Classification**: {classification}
-**Prepared By**: Development Team
-**Reviewed By**: Technical Architecture Board
-**Approved By**: Technical Architecture Board
-**Date**: {datetime.datetime.now().strftime("%Y-%m-%d")}
-**Version**: 1.0
-**Next Review**: {(datetime.datetime.now() + datetime.timedelta(days=90)).strftime("%Y-%m-%d")}
-
-## Distribution List
-- Technical Architecture Board
-- Development Team
-- Quality Assurance
-- Configuration Management
-
-## Revision History
-| Version | Date | Author | Changes |
-|---------|------|--------|---------|
-| 1.0 | {datetime.datetime.now().strftime("%Y-%m-%d")} | Development Team | Initial version |
-
-***
-
-## Executive Summary
-
-[Executive summary content - 1 page maximum]
-
-## Scope and Purpose
-
-[Document scope and purpose]
-
-## Referenced Documents
-
-- MIL-STD-498: Software Development and Documentation
-- CRU-PROC-1.0-20241201: MIL-SPEC Documentation Process
-
-## Definitions and Acronyms
-
-[Key terms and definitions]
-
-***
-
-## Technical Content
-
-"""
-
-    def generate_srd(self) -> None:
-        """Generate System Requirements Document"""
-        content = self.create_document_header(
-            "Crucible Engine: System Requirements Document", 
-            "SRD"
-        )
-        
-        content += """
+from typing import Dict, Iterable, Union
+
+# Path components accepted by _safe_path_join (bound matcher, so the hot
+# path does a single call instead of a global + attribute lookup)
+_match_safe_component = re.compile(r'[A-Za-z0-9_.-]+').fullmatch
+
+# Document types produced/checked by the generator, and plain versions;
+# document IDs built only from these need no sanitization
+_DOC_TYPES = frozenset({"SRD", "SDD", "SECD", "TPD", "VCM"})
+_VERSION_RE = re.compile(r'\d+(?:\.\d+)*')
+
+# Same replacements as html.escape(quote=True), applied in a single pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+_find_html_special = re.compile(r'[&<>"\']').search
+
+# System Requirements Document body (static, appended after the header)
+_SRD_BODY = """
 ### Functional Requirements
 
 #### REQ-001: Natural Language Processing
@@ -196,17 +108,10 @@ class MilSpecDocGenerator:
 | REQ-003 | Code Generator | TC-003 | Testing |
 
 """
-        
-        self.write_document("SRD", content)
-    
-    def generate_sdd(self) -> None:
-        """Generate System Design Document"""
-        content = self.create_document_header(
-            "Crucible Engine: System Design Document", 
-            "SDD"
-        )
-        
-        content += """
+_SRD_BODY_BYTES = _SRD_BODY.encode('utf-8')
+
+# System Design Document body (static, appended after the header)
+_SDD_BODY = """
 ### Design Overview
 
 The Crucible Engine implements a four-layer verification pipeline:
@@ -276,18 +181,10 @@ The Crucible Engine implements a four-layer verification pipeline:
 - Comprehensive error logging
 
 """
-        
-        self.write_document("SDD", content)
-    
-    def generate_secd(self) -> None:
-        """Generate Security Design Document"""
-        content = self.create_document_header(
-            "Crucible Engine: Security Design Document", 
-            "SECD", 
-            "RESTRICTED"
-        )
-        
-        content += """
+_SDD_BODY_BYTES = _SDD_BODY.encode('utf-8')
+
+# Security Design Document body (static, appended after the header)
+_SECD_BODY = """
 ### Security Architecture
 
 #### Threat Model
@@ -347,17 +244,10 @@ The Crucible Engine implements a four-layer verification pipeline:
 6. **Lessons Learned**: Post-incident review
 
 """
-        
-        self.write_document("SECD", content)
-    
-    def generate_tpd(self) -> None:
-        """Generate Test Plan Document"""
-        content = self.create_document_header(
-            "Crucible Engine: Test Plan Document", 
-            "TPD"
-        )
-        
-        content += """
+_SECD_BODY_BYTES = _SECD_BODY.encode('utf-8')
+
+# Test Plan Document body (static, appended after the header)
+_TPD_BODY = """
 ### Test Strategy
 
 #### Test Levels
@@ -430,28 +320,187 @@ The Crucible Engine implements a four-layer verification pipeline:
 - Performance requirements not met
 
 """
+_TPD_BODY_BYTES = _TPD_BODY.encode('utf-8')
+
+@functools.lru_cache(maxsize=32)
+def _render_document_header(title: str, doc_id: str, classification: str,
+                            date_str: str, next_review_str: str) -> str:
+    """Render the standard MIL-SPEC document header (memoized)"""
+    return f"""# {title}
+**Document ID**: {doc_id}
+**Classification**: {classification}
+**Prepared By**: Development Team
+**Reviewed By**: Technical Architecture Board
+**Approved By**: Technical Architecture Board
+**Date**: {date_str}
+**Version**: 1.0
+**Next Review**: {next_review_str}
+
+## Distribution List
+- Technical Architecture Board
+- Development Team
+- Quality Assurance
+- Configuration Management
+
+## Revision History
+| Version | Date | Author | Changes |
+|---------|------|--------|---------|
+| 1.0 | {date_str} | Development Team | Initial version |
+
+***
+
+## Executive Summary
+
+[Executive summary content - 1 page maximum]
+
+## Scope and Purpose
+
+[Document scope and purpose]
+
+## Referenced Documents
+
+- MIL-STD-498: Software Development and Documentation
+- CRU-PROC-1.0-20241201: MIL-SPEC Documentation Process
+
+## Definitions and Acronyms
+
+[Key terms and definitions]
+
+***
+
+## Technical Content
+
+"""
+
+class MilSpecDocGenerator:
+    def __init__(self, project_root: str):
+        # Resolve the project root once; all other paths are joined below it
+        self.project_root = Path(project_root).resolve()
+        self.docs_dir = self._safe_path_join(self.project_root, "docs")
+        self.templates_dir = self._safe_path_join(self.docs_dir, "templates")
+        self.active_dir = self._safe_path_join(self.docs_dir, "active")
+        
+        # Ensure directories exist
+        try:
+            self.docs_dir.mkdir(exist_ok=True)
+            self.templates_dir.mkdir(exist_ok=True)
+            self.active_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            raise ValueError(f"Failed to create directories: {e}")
+        
+        # Current date for document IDs (timezone-aware), formatted once;
+        # every header, ID and file name reuses these strings
+        self.current_date = datetime.datetime.now(datetime.timezone.utc)
+        self._date_str = self.current_date.strftime("%Y-%m-%d")
+        self._next_review_str = (self.current_date + datetime.timedelta(days=90)).strftime("%Y-%m-%d")
+        self._file_date_str = self.current_date.strftime("%Y%m%d")
         
-        self.write_document("TPD", content)
+        # Fixed parts of every document ID: CRU-<type>-<version>-<date>
+        self._id_prefix = "CRU-"
+        self._id_suffix = f"-{self._file_date_str}"
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _safe_path_join(base_path: Path, *paths: str) -> Path:
+        """Safely join paths and prevent directory traversal (memoized)"""
+        result = base_path
+        for path in paths:
+            # Each component must be a single plain name: no separators,
+            # no "." / "..", so the result cannot leave base_path
+            component = str(path)
+            if not _match_safe_component(component) or component in ('.', '..'):
+                raise ValueError(f"Invalid path component: {path}")
+            result = result / component
+        
+        return result
+    
+    def _sanitize_input(self, text: str) -> str:
+        """Sanitize user input to prevent XSS"""
+        if not isinstance(text, str):
+            raise ValueError("Input must be a string")
+        # Most inputs contain nothing to escape
+        if _find_html_special(text) is None:
+            return text.strip()
+        return text.strip().translate(_HTML_ESCAPE_TABLE)
+    
+    def generate_document_id(self, doc_type: str, version: str = "1.0") -> str:
+        """Generate MIL-SPEC compliant document ID"""
+        # Known document types with a plain numeric version need no escaping
+        if isinstance(doc_type, str) and isinstance(version, str):
+            trusted_type = doc_type.strip()
+            trusted_version = version.strip()
+            if trusted_type in _DOC_TYPES and _VERSION_RE.fullmatch(trusted_version):
+                return self._id_prefix + trusted_type + "-" + trusted_version + self._id_suffix
+        
+        # Sanitize inputs
+        clean_doc_type = self._sanitize_input(doc_type)
+        clean_version = self._sanitize_input(version)
+        return self._id_prefix + clean_doc_type + "-" + clean_version + self._id_suffix
+    
+    def create_document_header(self, title: str, doc_type: str, classification: str = "CONTROLLED") -> str:
+        """Create standard MIL-SPEC document header"""
+        doc_id = self.generate_document_id(doc_type)
+        return _render_document_header(title, doc_id, classification,
+                                       self._date_str, self._next_review_str)
+
+    def generate_srd(self) -> None:
+        """Generate System Requirements Document"""
+        header = self.create_document_header(
+            "Crucible Engine: System Requirements Document", 
+            "SRD"
+        )
+        
+        self.write_document("SRD", (header.encode('utf-8'), _SRD_BODY_BYTES))
     
-    def write_document(self, doc_type: str, content: str) -> None:
-        """Write document to file with proper error handling"""
+    def generate_sdd(self) -> None:
+        """Generate System Design Document"""
+        header = self.create_document_header(
+            "Crucible Engine: System Design Document", 
+            "SDD"
+        )
+        
+        self.write_document("SDD", (header.encode('utf-8'), _SDD_BODY_BYTES))
+    
+    def generate_secd(self) -> None:
+        """Generate Security Design Document"""
+        header = self.create_document_header(
+            "Crucible Engine: Security Design Document", 
+            "SECD", 
+            "RESTRICTED"
+        )
+        
+        self.write_document("SECD", (header.encode('utf-8'), _SECD_BODY_BYTES))
+    
+    def generate_tpd(self) -> None:
+        """Generate Test Plan Document"""
+        header = self.create_document_header(
+            "Crucible Engine: Test Plan Document", 
+            "TPD"
+        )
+        
+        self.write_document("TPD", (header.encode('utf-8'), _TPD_BODY_BYTES))
+    
+    def write_document(self, doc_type: str, chunks: Iterable[Union[bytes, str]]) -> None:
+        """Write document chunks (UTF-8 bytes or str) to file with proper error handling"""
         try:
             # Sanitize inputs
             clean_doc_type = self._sanitize_input(doc_type)
             
             # Create safe filename
-            date_str = self.current_date.strftime("%Y%m%d")
-            filename = f"{clean_doc_type}_{date_str}.md"
+            filename = f"{clean_doc_type}_{self._file_date_str}.md"
             filepath = self._safe_path_join(self.active_dir, filename)
             
-            # Write file with proper encoding and error handling
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write file in binary mode; static bodies are already UTF-8 encoded
+            filepath.write_bytes(b"".join(
+                chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                for chunk in chunks
+            ))
             
-            print(f"[GENERATED] Generated: {filepath}")
+            # Single write so lines from concurrent generators never interleave
+            sys.stdout.write(f"[GENERATED] Generated: {filepath}\n")
             
         except (OSError, IOError, ValueError) as e:
-            print(f"[ERROR] Failed to write document {doc_type}: {e}")
+            sys.stdout.write(f"[ERROR] Failed to write document {doc_type}: {e}\n")
             raise
     
     def check_compliance(self) -> Dict[str, bool]:
@@ -465,25 +514,38 @@ The Crucible Engine implements a four-layer verification pipeline:
         }
         
         compliance_status = {}
+        out = []
+        
+        # Scan the directory once and collect the <TYPE> prefix of every
+        # <TYPE>_*.md file
+        found_types = set()
+        with os.scandir(self.active_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and '_' in entry.name:
+                    found_types.add(entry.name.split('_', 1)[0])
         
         for doc_type, doc_name in required_docs.items():
             # Check if document exists
-            doc_files = list(self.active_dir.glob(f"{doc_type}_*.md"))
-            if doc_files:
+            if doc_type in found_types:
                 compliance_status[doc_type] = True
-                print(f"[OK] {doc_name}: Found")
+                out.append(f"[OK] {doc_name}: Found")
             else:
                 compliance_status[doc_type] = False
-                print(f"[MISSING] {doc_name}: Missing")
+                out.append(f"[MISSING] {doc_name}: Missing")
+        
+        # Emit the report in one write
+        sys.stdout.write("\n".join(out) + "\n")
         
         return compliance_status
     
     def generate_all_documents(self) -> None:
         """Generate all required MIL-SPEC documents with error handling"""
-        print("[GENERATOR] Generating MIL-SPEC Documentation Suite...")
-        print(f"[DATE] Date: {self.current_date.strftime('%Y-%m-%d')}")
-        print(f"[OUTPUT] Output Directory: {self.active_dir}")
-        print()
+        sys.stdout.write(
+            "[GENERATOR] Generating MIL-SPEC Documentation Suite...\n"
+            f"[DATE] Date: {self._date_str}\n"
+            f"[OUTPUT] Output Directory: {self.active_dir}\n"
+            "\n"
+        )
         
         documents = [
             ("SRD", self.generate_srd),
@@ -492,27 +554,34 @@ The Crucible Engine implements a four-layer verification pipeline:
             ("TPD", self.generate_tpd)
         ]
         
-        for doc_name, doc_func in documents:
+        def generate(document):
+            doc_name, doc_func = document
             try:
                 doc_func()
             except Exception as e:
-                print(f"[ERROR] Failed to generate {doc_name}: {e}")
-                continue
+                sys.stdout.write(f"[ERROR] Failed to generate {doc_name}: {e}\n")
         
-        print()
-        print("📊 Compliance Check:")
+        # Documents are independent, so build and write them concurrently
+        # (imported here so `check` never loads the thread pool machinery)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(documents)) as executor:
+            list(executor.map(generate, documents))
+        
+        sys.stdout.write("\n📊 Compliance Check:\n")
         compliance = self.check_compliance()
         
         total_docs = len(compliance)
         compliant_docs = sum(compliance.values())
         compliance_percentage = (compliant_docs / total_docs) * 100
         
-        print(f"[COMPLETE] Compliance Status: {compliance_percentage:.0f}% ({compliant_docs}/{total_docs})")
-        
         if compliance_percentage == 100:
-            print("[SUCCESS] Full MIL-SPEC compliance achieved!")
+            verdict = "[SUCCESS] Full MIL-SPEC compliance achieved!"
         else:
-            print("[WARNING] Additional documents required for full compliance")
+            verdict = "[WARNING] Additional documents required for full compliance"
+        sys.stdout.write(
+            f"[COMPLETE] Compliance Status: {compliance_percentage:.0f}% ({compliant_docs}/{total_docs})\n"
+            f"{verdict}\n"
+        )
 
 def main():
     if len(sys.argv) < 2: